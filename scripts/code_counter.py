@@ -0,0 +1,593 @@
+# -*- coding: utf-8 -*-
+"""
+Author:              Anna L.D. Latour
+Creation date:       19 October 2026
+Maintainer:          Anna L.D. Latour
+Contact:             a.l.d.latour@tudelft.nl
+File:                code_counter.py
+Description:         Class for counting, and uniformly sampling, the
+                     identifying codes of each size <= b of a network, by
+                     dynamic programming over a tree decomposition of the
+                     network.
+                     A set C of nodes is an identifying code with radius r and
+                     fault tolerance k iff every r-ball B(v) contains at least
+                     k + 1 nodes of C (domination), and every two r-balls B(u)
+                     and B(v) differ in at least k + 1 nodes of C (separation);
+                     these are the constraints of the PB encoding (see
+                     pb_encoder.py). Since the r-balls of the network are the
+                     closed neighbourhoods of its r-th power, we decompose
+                     that power, which is the network itself for r = 1. We
+                     call the nodes of C in B(v) the trace of v.
+                     We process each bag by introducing and forgetting nodes,
+                     and by joining the tables of its children. A node is
+                     forgotten once all its neighbours have been seen, so its
+                     trace is final, and the traces of the nodes seen later
+                     can only share nodes with it via the current bag. The
+                     state of a bag therefore records:
+                     - which of its nodes are in the code;
+                     - for each of its nodes, how many more code neighbours it
+                       needs among the nodes that are not seen yet, to be
+                       dominated and separated from the forgotten nodes;
+                     - for each of its nodes, the number of forgotten code
+                       nodes in its trace, and for each pair of its nodes, the
+                       number of forgotten code nodes in which their traces
+                       differ;
+                     - the traces of the forgotten nodes that can still clash
+                       with nodes that are not seen yet, restricted to the
+                       bag, with the number of forgotten code nodes in them.
+                     All numbers are capped at k + 1. Only the reachable
+                     states are stored, so the tables stay small for sparse,
+                     narrow networks, although they can grow doubly
+                     exponentially with the width.
+                     The number of codes of each size is kept as a polynomial,
+                     in which the coefficient of x^i counts the codes with i
+                     nodes. We store such a polynomial as a single Python int,
+                     with one slot of n + 1 bits per coefficient (Kronecker
+                     substitution): since no count exceeds 2^n, the slots do
+                     not overflow, and adding and multiplying polynomials
+                     become adding and multiplying ints. A node is counted when
+                     it is forgotten, which happens exactly once.
+Version:             0.0.1
+Copyright:           (C) 2026, Anna L.D. Latour
+License:             MIT
+
+Copyright (C) 2026 Anna L.D. Latour
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+
+# Generic/Built-in
+import bisect
+from functools import lru_cache
+import random
+
+import networkx as nx
+from networkx.algorithms.approximation import treewidth_min_degree, treewidth_min_fill_in
+
+# Own modules/libraries
+from pb_encoder import PBEncoder
+
+# State of the empty bag: (code, needs, forgotten, differences, residuals)
+EMPTY_STATE = (0, 0, 0, 0, frozenset())
+
+
+@lru_cache(maxsize=None)
+def _spread(mask: int, stride: int) -> int:
+    """ Move bit i of a bitmask to bit i * stride. """
+    spread = 0
+    while mask:
+        low = mask & -mask
+        spread |= 1 << ((low.bit_length() - 1) * stride)
+        mask ^= low
+    return spread
+
+
+def _choose(weights: list, rng: random.Random) -> int:
+    """ Return index i with probability weights[i] / sum(weights). """
+    r = rng.randrange(sum(weights))
+    for i, weight in enumerate(weights):
+        if r < weight:
+            return i
+        r -= weight
+    raise ValueError("Cannot choose from zero weights.")
+
+
+class CodeCounter(PBEncoder):
+    """
+    The nodes of a bag are identified by their positions in the bag (a sorted
+    tuple of node indices), and a state is a tuple
+    (code, needs, forgotten, differences, residuals) of ints and a frozenset:
+    - code is a bitmask over the positions;
+    - needs, forgotten and differences store numbers in 0..k+1 in unary, as
+      k + 1 levels, in which bit q of level l - 1 is set iff the number of
+      position q is at least l. Hence, taking the maximum is taking the union,
+      and adding one is a shift. Each level of needs and forgotten has
+      self._stride bits, one per position; each level of differences is a
+      matrix, with a row of self._stride bits per position;
+    - each residual is a trace, as a bitmask over the positions, plus the
+      number of forgotten code nodes in it shifted left by self._stride.
+    self._stride is the size of the largest bag, so that the positions of a
+    bag never overflow.
+    """
+
+    def __init__(self):
+        PBEncoder.__init__(self)
+        self._max_degree = None
+        self._slot = None
+        self._width = None
+        self._levels = None
+        self._stride = None
+        self._ones_by_block = dict()
+        self._adjacency = []
+        self._root = None
+        self._order = []
+        self._children = dict()
+        self._bags = dict()
+        self._below = dict()
+        self._tables = dict()
+
+    def _monomial(self, degree: int) -> int:
+        return 1 << (self._slot * degree)
+
+    def _truncate(self, p: int, code: int, needs: int) -> int:
+        """
+        Drop the terms of a polynomial that would exceed the budget once the
+        code nodes in the bag, which are counted when they are forgotten, are
+        added, plus the code nodes that are not seen yet but are needed by the
+        nodes in the bag (at least the largest need).
+        """
+        largest_need = (needs.bit_length() + self._stride - 1) // self._stride
+        degree = self._max_degree - code.bit_count() - largest_need
+        return p & (self._monomial(degree + 1) - 1) if degree >= 0 else 0
+
+    def _coefficient(self, p: int, degree: int) -> int:
+        if degree < 0:
+            return 0
+        return (p >> (self._slot * degree)) & ((1 << self._slot) - 1)
+
+    def _coefficients(self, p: int) -> list:
+        return [self._coefficient(p, i) for i in range(self._max_degree + 1)]
+
+    def _ones(self, block: int) -> int:
+        """ The number with bit 0 of each level set, for levels of block bits. """
+        if block not in self._ones_by_block:
+            self._ones_by_block[block] = ((1 << (block * self._levels)) - 1) // ((1 << block) - 1)
+        return self._ones_by_block[block]
+
+    def _replicate(self, mask: int, block: int) -> int:
+        """ Copy a bitmask to each level of a number with blocks of block bits. """
+        return mask * self._ones(block)
+
+    def _unary(self, number: int, pos: int) -> int:
+        """ The number at position pos of a vector, in unary. """
+        return sum(1 << (level * self._stride + pos) for level in range(number))
+
+    def _increment(self, numbers: int, mask: int, block: int) -> int:
+        """ Add one to the numbers at the bits in mask, which is replicated. """
+        full = (1 << (block * self._levels)) - 1
+        return numbers | ((numbers << block | ((1 << block) - 1)) & mask & full)
+
+    def _decrement(self, numbers: int, mask: int, block: int) -> int:
+        """ Subtract one from the nonzero numbers at the bits in mask, which is replicated. """
+        return (numbers & ~mask) | ((numbers >> block) & mask)
+
+    def _add(self, left: int, right: int, block: int) -> int:
+        """ Add two sets of numbers, capped at k + 1. """
+        full = (1 << (block * self._levels)) - 1
+        total = left | right
+        for shift in range(1, self._levels):
+            right_level = (right >> ((shift - 1) * block)) & ((1 << block) - 1)
+            if right_level:
+                total |= (left << (shift * block)) & self._replicate(right_level, block) & full
+        return total
+
+    def _subtract(self, left: int, right: int, block: int) -> int:
+        """ Subtract two sets of numbers, where negative numbers become zero. """
+        mask = (1 << block) - 1
+        difference = 0
+        at_least = mask
+        for shift in range(self._levels + 1):
+            above = (right >> (shift * block)) & mask if shift < self._levels else 0
+            # The positions where right is exactly shift
+            exactly = at_least & ~above
+            if exactly:
+                difference |= (left >> (shift * block)) & self._replicate(exactly, block)
+            at_least = above
+        return difference
+
+    def _build_tree_decomposition(self):
+        """
+        Build a tree decomposition of the r-th power of the network, in which
+        two nodes are adjacent iff they are at distance 1..r, and root it at
+        an empty bag. We take the narrower of the decompositions found by the
+        min-degree and the min-fill-in heuristics, since neither is always
+        better. For each bag, we store its nodes as a sorted tuple of node
+        indices, and the set of nodes in the bags below it.
+        """
+        self._adjacency = [set(ball) - {idx} for idx, ball in enumerate(self._balls)]
+        power = nx.Graph()
+        power.add_nodes_from(range(len(self._idx2node)))
+        power.add_edges_from((u, v) for u, nbs in enumerate(self._adjacency) for v in nbs if u < v)
+        self._width, decomposition = min(
+            (treewidth_min_degree(power), treewidth_min_fill_in(power)),
+            key=lambda candidate: candidate[0]
+        )
+
+        # An empty root bag connects the components of the decomposition
+        self._root = frozenset()
+        decomposition.add_node(self._root)
+        decomposition.add_edges_from(
+            (self._root, next(iter(component)))
+            for component in nx.connected_components(decomposition.copy())
+            if self._root not in component
+        )
+        self._children = {bag: [] for bag in decomposition.nodes()}
+        for parent, child in nx.bfs_edges(decomposition, self._root):
+            self._children[parent].append(child)
+        # Children before parents
+        self._order = list(nx.dfs_postorder_nodes(decomposition, self._root))
+        self._bags = {bag: tuple(sorted(bag)) for bag in decomposition.nodes()}
+        for bag in self._order:
+            self._below[bag] = set(bag).union(*[self._below[child] for child in self._children[bag]])
+
+    def _bag_adjacency(self, bag: tuple) -> list:
+        """ For each node in a bag, the bitmask of its neighbours in the bag. """
+        return [sum(1 << pos for pos, other in enumerate(bag) if other in self._adjacency[idx])
+                for idx in bag]
+
+    def _dead_needs(self, bag: tuple, seen: set) -> int:
+        """
+        The needs that cannot be met anymore: those that exceed the number of
+        neighbours of a node that are not seen yet.
+        """
+        dead = 0
+        for pos, idx in enumerate(bag):
+            unseen = len(self._adjacency[idx] - seen)
+            for level in range(unseen, self._levels):
+                dead |= 1 << (level * self._stride + pos)
+        return dead
+
+    def _shift_masks(self, pos: int, insert: bool) -> tuple:
+        """
+        Masks for inserting a position at pos, or removing position pos: the
+        bits of the positions below it and above it, in a vector and in the
+        rows and columns of a matrix, at all levels.
+        """
+        stride = self._stride
+        first_high = pos if insert else pos + 1
+        low = (1 << pos) - 1
+        high = ((1 << stride) - 1) ^ ((1 << first_high) - 1)
+        row = (1 << stride) - 1
+        vector = (self._replicate(low, stride), self._replicate(high, stride))
+        matrix_rows = (self._replicate(sum(row << (i * stride) for i in range(pos)), stride * stride),
+                       self._replicate(sum(row << (i * stride) for i in range(first_high, stride)), stride * stride))
+        matrix_columns = (self._replicate(sum(low << (i * stride) for i in range(stride)), stride * stride),
+                          self._replicate(sum(high << (i * stride) for i in range(stride)), stride * stride))
+        return (low, high), vector, matrix_rows, matrix_columns
+
+    def _introduce(self, table: dict, bag: tuple, idx: int, seen: set, record: bool):
+        """
+        Add a node to a bag, both in and out of the code. Its edges to the nodes
+        in the bag are processed here.
+        :return: the new table, the new bag, and (if record) for each new state
+                 the states it came from and whether the node is in the code
+        """
+        degree, stride = self._levels, self._stride
+        pos = bisect.bisect(bag, idx)
+        new_bag = bag[:pos] + (idx,) + bag[pos:]
+        neighbours = self._bag_adjacency(new_bag)[pos]
+        (low, high), (vector_low, vector_high), (rows_low, rows_high), (columns_low, columns_high) = \
+            self._shift_masks(pos, insert=True)
+        row = (1 << stride) - 1
+        decrement = self._replicate(neighbours, stride)
+        dead = self._dead_needs(new_bag, seen)
+        unary = [self._unary(need, pos) for need in range(degree + 1)]
+
+        new_table = dict()
+        back = dict()
+        for state, poly in table.items():
+            code, needs, forgotten, differences, residuals = state
+            code = (code & low) | ((code & high) << 1)
+            needs = (needs & vector_low) | ((needs & vector_high) << 1)
+            forgotten = (forgotten & vector_low) | ((forgotten & vector_high) << 1)
+            differences = (differences & rows_low) | ((differences & rows_high) << stride)
+            differences = (differences & columns_low) | ((differences & columns_high) << 1)
+            # Nothing is forgotten in the trace of the new node yet, so its
+            # traces differ from the others in their forgotten code nodes
+            for level in range(degree):
+                level_forgotten = (forgotten >> (level * stride)) & row
+                differences |= ((level_forgotten << (pos * stride)) |
+                                (_spread(level_forgotten, stride) << pos)) << (level * stride * stride)
+            residuals = frozenset((residual & ~row) | (residual & low) | ((residual & high) << 1)
+                                  for residual in residuals)
+            for in_code in (0, 1):
+                new_code = code | (in_code << pos)
+                trace = (new_code & neighbours) | (in_code << pos)
+                need = degree - trace.bit_count()
+                for residual in residuals:
+                    need = max(need, degree - (residual >> stride) - ((residual & row) ^ trace).bit_count())
+                new_needs = self._decrement(needs, decrement, stride) if in_code else needs
+                new_needs |= unary[max(need, 0)]
+                if new_needs & dead:
+                    continue
+                new_poly = self._truncate(poly, new_code, new_needs)
+                if not new_poly:
+                    continue
+                key = (new_code, new_needs, forgotten, differences, residuals)
+                new_table[key] = new_table.get(key, 0) + new_poly
+                if record:
+                    back.setdefault(key, []).append((state, in_code))
+        return new_table, new_bag, back
+
+    def _forget(self, table: dict, bag: tuple, idx: int, seen: set, record: bool):
+        """
+        Remove a node from a bag. All its neighbours have been seen, so its
+        trace is final: it must be dominated and separated from all nodes seen
+        so far, and it must be separated from the nodes in the bag by the code
+        nodes that are not seen yet. If it is in the code, it is counted here.
+        :return: the new table, the new bag, and (if record) for each new state
+                 the states it came from and whether the node is in the code
+        """
+        degree, stride = self._levels, self._stride
+        pos = bag.index(idx)
+        new_bag = bag[:pos] + bag[pos + 1:]
+        adjacency = self._bag_adjacency(bag)
+        neighbours = adjacency[pos]
+        others = [(other, adjacency[other] | (1 << other)) for other in range(len(bag)) if other != pos]
+        (low, high), (vector_low, vector_high), (rows_low, rows_high), (columns_low, columns_high) = \
+            self._shift_masks(pos, insert=False)
+        row = (1 << stride) - 1
+        increment = self._replicate(neighbours, stride)
+        # The pairs of nodes of which exactly one is adjacent to the node
+        split = self._replicate(sum(((neighbours >> i ^ neighbours >> j) & 1) << (i * stride + j)
+                                    for i, _ in others for j, _ in others), stride * stride)
+        dead = self._dead_needs(new_bag, seen)
+        unary = [[self._unary(need, other) for need in range(degree + 1)] for other in range(len(bag))]
+        vector_ones, matrix_ones = self._ones(stride), self._ones(stride * stride)
+
+        new_table = dict()
+        back = dict()
+        for state, poly in table.items():
+            code, needs, forgotten, differences, residuals = state
+            if needs >> pos & 1:
+                continue
+            in_code = code >> pos & 1
+            trace = (code & neighbours) | (in_code << pos)
+            n_forgotten = ((forgotten >> pos) & vector_ones).bit_count()
+            differences_of_node = differences >> (pos * stride)
+            for other, closed in others:
+                difference = (trace ^ (code & closed)).bit_count()
+                if difference < degree:
+                    difference += ((differences_of_node >> other) & matrix_ones).bit_count()
+                    needs |= unary[other][max(degree - difference, 0)]
+            new_residuals = set()
+            for residual in (residuals if n_forgotten == degree else residuals | {trace | n_forgotten << stride}):
+                residual += (residual >> pos & 1) << stride
+                if residual >> stride < degree:
+                    new_residuals.add((residual & ~row) | (residual & low) | ((residual & high) >> 1))
+            if in_code:
+                forgotten = self._increment(forgotten, increment, stride)
+                differences = self._increment(differences, split, stride * stride)
+            needs = (needs & vector_low) | ((needs & vector_high) >> 1)
+            if needs & dead:
+                continue
+            new_code = (code & low) | ((code & high) >> 1)
+            new_poly = self._truncate(poly << (self._slot * in_code), new_code, needs)
+            if not new_poly:
+                continue
+            forgotten = (forgotten & vector_low) | ((forgotten & vector_high) >> 1)
+            differences = (differences & rows_low) | ((differences & rows_high) >> stride)
+            differences = (differences & columns_low) | ((differences & columns_high) >> 1)
+            key = (new_code, needs, forgotten, differences, frozenset(new_residuals))
+            new_table[key] = new_table.get(key, 0) + new_poly
+            if record:
+                back.setdefault(key, []).append((state, in_code))
+        return new_table, new_bag, back
+
+    def _join(self, left: dict, right: dict, bag: tuple, seen: set, record: bool):
+        """
+        Join the tables of two children with the same bag, whose forgotten
+        nodes are disjoint and not adjacent. A forgotten node on one side must
+        be separated from the forgotten nodes on the other side, and the
+        forgotten code neighbours on one side are not seen by the other side.
+        :return: the new table, and (if record) for each new state the pairs of
+                 states it came from
+        """
+        degree, stride = self._levels, self._stride
+        dead = self._dead_needs(bag, seen)
+        # Group the states by code, forgotten, needs, and the smallest number
+        # of code nodes they count, which decide whether they can be joined,
+        # so that we can skip incompatible groups at once
+        groups = []
+        for side in (left, right):
+            grouped = dict()
+            for state, poly in side.items():
+                code, needs, forgotten = state[:3]
+                smallest = ((poly & -poly).bit_length() - 1) // self._slot
+                grouped.setdefault(code, dict()).setdefault((smallest, forgotten, needs), []).append((state, poly))
+            groups.append({code: sorted(by_key.items(), key=lambda item: item[0][0])
+                           for code, by_key in grouped.items()})
+        left_groups, right_groups = groups
+
+        table = dict()
+        back = dict()
+        for code, left_by_key in left_groups.items():
+            right_by_key = right_groups.get(code, [])
+            remaining = self._max_degree - code.bit_count()
+            for (left_smallest, left_forgotten, left_needs), left_states in left_by_key:
+                for (right_smallest, right_forgotten, right_needs), right_states in right_by_key:
+                    if left_smallest + right_smallest > remaining:
+                        break
+                    needs = (self._subtract(left_needs, right_forgotten, stride) |
+                             self._subtract(right_needs, left_forgotten, stride))
+                    if needs & dead:
+                        continue
+                    forgotten = self._add(left_forgotten, right_forgotten, stride)
+                    for left_state, left_poly in left_states:
+                        left_differences, left_residuals = left_state[3:]
+                        for right_state, right_poly in right_states:
+                            right_differences, right_residuals = right_state[3:]
+                            if any((left_residual >> stride) + (right_residual >> stride) +
+                                   ((left_residual ^ right_residual) & ((1 << stride) - 1)).bit_count() < degree
+                                   for left_residual in left_residuals for right_residual in right_residuals):
+                                continue
+                            poly = self._truncate(left_poly * right_poly, code, needs)
+                            if not poly:
+                                continue
+                            state = (code, needs, forgotten,
+                                     self._add(left_differences, right_differences, stride * stride),
+                                     left_residuals | right_residuals)
+                            table[state] = table.get(state, 0) + poly
+                            if record:
+                                back.setdefault(state, []).append((left_state, right_state))
+        return table, back
+
+    def _process(self, bag, record=False) -> tuple:
+        """
+        Compute the table of a bag from those of its children: for each
+        reachable state, the polynomial that counts the partial codes on the
+        nodes forgotten below the bag that lead to it, by number of nodes in
+        the code. The table of each child is lifted to the bag, by forgetting
+        and introducing nodes, and the lifted tables are joined.
+        :param record: keep all intermediate tables and back pointers, for
+                       sampling
+        :return:       the chains, as (child, tables, steps) tuples, where
+                       steps[i] = (kind, node index, back pointers) turns
+                       tables[i] into tables[i + 1], and the joins, as
+                       (table, back pointers) tuples
+        """
+        target = self._bags[bag]
+        chains = []
+        seen_by_chain = []
+        for child in self._children[bag] or [None]:
+            if child is None:
+                table, child_bag, seen = {EMPTY_STATE: self._monomial(0)}, (), set()
+            else:
+                table, child_bag, seen = self._tables[child], self._bags[child], set(self._below[child])
+            tables = [table]
+            steps = []
+            for idx in [idx for idx in child_bag if idx not in target]:
+                table, child_bag, back = self._forget(table, child_bag, idx, seen, record)
+                tables.append(table)
+                steps.append(('forget', idx, back))
+            for idx in [idx for idx in target if idx not in child_bag]:
+                seen.add(idx)
+                table, child_bag, back = self._introduce(table, child_bag, idx, seen, record)
+                tables.append(table)
+                steps.append(('introduce', idx, back))
+            chains.append((child, tables if record else [table], steps if record else []))
+            seen_by_chain.append(seen)
+
+        joins = [(chains[0][1][-1], None)]
+        seen = seen_by_chain[0]
+        for (_, tables, _), chain_seen in zip(chains[1:], seen_by_chain[1:]):
+            seen |= chain_seen
+            joins.append(self._join(joins[-1][0], tables[-1], target, seen, record))
+        return chains, joins
+
+    def count(self, max_width=20) -> list:
+        """
+        Count the identifying codes of each size <= budget.
+        :param max_width: refuse to count if the tree decomposition is wider
+                          than this, since the number of states can grow
+                          doubly exponentially with the width
+        :return:          list, in which element i is the number of
+                          identifying codes with i nodes
+        """
+        self._compute_balls()
+        n_nodes = self._G.number_of_nodes()
+        self._max_degree = n_nodes if self._budget < 0 else min(self._budget, n_nodes)
+        self._slot = n_nodes + 1
+        self._levels = self._fault_tolerance + 1
+
+        self._build_tree_decomposition()
+        if self._width > max_width:
+            raise ValueError(f"Tree decomposition has width {self._width} > {max_width}.")
+        self._stride = self._width + 1
+        for bag in self._order:
+            self._tables[bag] = self._process(bag)[1][-1][0]
+        return self._coefficients(sum(self._tables[self._root].values()))
+
+    def _sample_chain(self, chain: tuple, state: tuple, size: int, code: list, rng: random.Random) -> tuple:
+        """
+        Follow the steps of a chain backwards from a state, sampling the states
+        it came from with probability proportional to the number of codes that
+        extend them, and adding the forgotten code nodes to code.
+        :return: the state at the start of the chain and the number of code
+                 nodes forgotten before it
+        """
+        _, tables, steps = chain
+        for i in reversed(range(len(steps))):
+            kind, idx, back = steps[i]
+            candidates = back[state]
+            weights = [self._coefficient(tables[i][previous], size - in_code if kind == 'forget' else size)
+                       for previous, in_code in candidates]
+            state, in_code = candidates[_choose(weights, rng)]
+            if kind == 'forget' and in_code:
+                code.append(self._idx2node[idx])
+                size -= 1
+        return state, size
+
+    def sample(self, size: int, rng: random.Random, number=1) -> list:
+        """
+        Sample identifying codes with size nodes uniformly and independently at
+        random. Must be called after count(). Since only the table of each bag
+        is kept, the steps within each bag are recomputed, once for all
+        samples.
+        :param size:   number of nodes in the code
+        :param rng:    random number generator
+        :param number: number of codes to sample
+        :return:       list of codes, each a sorted list of nodes
+        """
+        counts = self._coefficients(sum(self._tables[self._root].values()))
+        if not 0 <= size <= self._max_degree or counts[size] == 0:
+            raise ValueError(f"There are no identifying codes with {size} nodes.")
+        codes = [[] for _ in range(number)]
+        candidates = list(self._tables[self._root].items())
+        weights = [self._coefficient(poly, size) for _, poly in candidates]
+        requests = {self._root: [(i, candidates[_choose(weights, rng)][0], size) for i in range(number)]}
+
+        # Parents before children
+        for bag in reversed(self._order):
+            if bag not in requests:
+                continue
+            chains, joins = self._process(bag, record=True)
+            for i, state, bag_size in requests.pop(bag):
+                # Undo the joins, last child first
+                for j in reversed(range(1, len(chains))):
+                    left_table, right_table = joins[j - 1][0], chains[j][1][-1]
+                    candidates = []
+                    weights = []
+                    for left_state, right_state in joins[j][1][state]:
+                        for left_size in range(bag_size + 1):
+                            weight = (self._coefficient(left_table[left_state], left_size) *
+                                      self._coefficient(right_table[right_state], bag_size - left_size))
+                            if weight:
+                                candidates.append((left_state, left_size, right_state))
+                                weights.append(weight)
+                    state, left_size, right_state = candidates[_choose(weights, rng)]
+                    start, start_size = self._sample_chain(chains[j], right_state, bag_size - left_size, codes[i], rng)
+                    requests.setdefault(chains[j][0], []).append((i, start, start_size))
+                    bag_size = left_size
+                start, start_size = self._sample_chain(chains[0], state, bag_size, codes[i], rng)
+                # Leaves start from the empty state
+                if chains[0][0] is not None:
+                    requests.setdefault(chains[0][0], []).append((i, start, start_size))
+        return [sorted(code) for code in codes]
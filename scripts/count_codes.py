@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Author:              Anna L.D. Latour
+Creation date:       19 October 2026
+Maintainer:          Anna L.D. Latour
+Contact:             a.l.d.latour@tudelft.nl
+File:                count_codes.py
+Description:         Script that counts the identifying codes of each size
+                     <= b of an undirected network, by dynamic programming
+                     over a tree decomposition, without calling a solver.
+                     Optionally, it samples codes of the smallest size (or a
+                     given size) uniformly at random.
+                     This is only feasible if the tree decomposition of the
+                     network (or of its r-th power, see code_counter.py) is
+                     narrow.
+Version:             0.0.1
+Copyright:           (C) 2026, Anna L.D. Latour
+License:             MIT
+
+Copyright (C) 2026 Anna L.D. Latour
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+# Generic/Built-in
+import argparse
+from datetime import datetime
+import os
+import random
+import sys
+
+# Own modules/libraries
+from code_counter import CodeCounter
+
+parser = argparse.ArgumentParser()
+required_args = parser.add_argument_group("Required arguments")
+optional_args = parser.add_argument_group("Optional arguments")
+required_args.add_argument("--network", "-n", type=str, required=True,
+                           help="Path to network file.")
+optional_args.add_argument("-b", type=int, required=False, default=-1,
+                           help="Budget: count codes with at most this many nodes.")
+optional_args.add_argument("-k", type=int, required=False, default=0,
+                           help="Fault tolerance.")
+optional_args.add_argument("--radius", "-r", type=int, required=False, default=1,
+                           help="Radius: each sensor covers the nodes within this distance.")
+optional_args.add_argument("--max_width", type=int, required=False, default=20,
+                           help="Maximum width of the tree decomposition.")
+optional_args.add_argument("--samples", type=int, required=False, default=0,
+                           help="Number of codes to sample uniformly at random.")
+optional_args.add_argument("--sample_size", type=int, required=False, default=None,
+                           help="Size of the sampled codes (default: smallest size with a code).")
+optional_args.add_argument("--seed", type=int, required=False, default=None,
+                           help="Random seed for sampling.")
+args = parser.parse_args()
+if args.radius < 0:
+    parser.error("--radius must be non-negative.")
+
+SCRIPT_NAME = os.path.basename(__file__)
+
+
+def log_message(message):
+    print(f'[{SCRIPT_NAME}], {datetime.now().strftime("%Y-%m-%d, %Hh%Mm%Ss")}: {message}')
+    sys.stdout.flush()
+
+
+log_message(f"Parsing network {args.network}.")
+instance = CodeCounter()
+instance.build_from_file(args.network, budget=args.b, fault_tolerance=args.k, radius=args.radius)
+
+log_message(f"Counting identifying codes with budget {args.b} and radius {args.radius}.")
+try:
+    counts = instance.count(max_width=args.max_width)
+except ValueError as exc:
+    log_message(f"Counting FAILED: {exc}")
+    sys.exit(1)
+
+for size, count in enumerate(counts):
+    if count:
+        print(f"Number of identifying codes with {size} nodes: {count}.")
+if not any(counts):
+    print("There are no identifying codes within the budget.")
+
+if args.samples > 0 and any(counts):
+    rng = random.Random(args.seed)
+    sample_size = args.sample_size
+    if sample_size is None:
+        sample_size = next(size for size, count in enumerate(counts) if count)
+    elif not 0 <= sample_size < len(counts) or counts[sample_size] == 0:
+        log_message(f"Sampling FAILED: there are no identifying codes with {sample_size} nodes within the budget.")
+        sys.exit(1)
+    log_message(f"Sampling {args.samples} identifying codes with {sample_size} nodes.")
+    for i, code in enumerate(instance.sample(sample_size, rng, number=args.samples)):
+        print(f"Sample #{i + 1}: {tuple(code)}.")
+
+log_message("Done!")
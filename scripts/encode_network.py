@@ -65,7 +65,21 @@ optional_args.add_argument("-b", type=int, required=False, default=-1,
                            help="Budget.")
 optional_args.add_argument("-k", type=int, required=False, default=0,
                            help="Fault tolerance.")
+optional_args.add_argument("--radius", "-r", type=int, required=False, default=1,
+                           help="Radius: each sensor covers the nodes within this distance.")
+optional_args.add_argument("--edge_diff", type=str, required=False, default=None,
+                           help="Path to edge-diff file, with lines '+ u v' (add edge) and '- u v' (remove edge). "
+                                "If given, the encoding in --old_encoding of the network in --network is updated "
+                                "incrementally.")
+optional_args.add_argument("--old_encoding", type=str, required=False, default=None,
+                           help="Path to encoding of the network before applying the edge diff.")
+optional_args.add_argument("--check", action="store_true",
+                           help="Check that the incrementally updated encoding matches a full re-encode.")
 args = parser.parse_args()
+if args.radius < 0:
+    parser.error("--radius must be non-negative.")
+if (args.edge_diff is None) != (args.old_encoding is None):
+    parser.error("--edge_diff and --old_encoding must be given together.")
 
 SCRIPT_NAME = os.path.basename(__file__)
 
@@ -79,12 +93,13 @@ log_message("Initialising PB instance.")
 
 instance = PBEncoder()
 build_successful = True
+exit_code = 0
 
 log_message(f"Parsing network {args.network}.")
 sys.stdout.flush()
 
 try:
-    instance.build_from_file(args.network, budget=args.b, fault_tolerance=args.k)
+    instance.build_from_file(args.network, budget=args.b, fault_tolerance=args.k, radius=args.radius)
     log_message("Building completed.")
 except Exception as exc:
     build_successful = False
@@ -93,17 +108,30 @@ except Exception as exc:
 sys.stdout.flush()
 
 if build_successful:
-    log_message(f"Encoding {args.network} with budget {args.b} into a set of PB constraints.")
+    log_message(f"Encoding {args.network} with budget {args.b} and radius {args.radius} into a set of PB constraints.")
     pathlib.Path(args.out_dir).mkdir(parents=True, exist_ok=True)
     try:
-        instance.encode(f"{args.out_dir}/{args.out_file}")
+        if args.edge_diff is None:
+            instance.encode(f"{args.out_dir}/{args.out_file}")
+        else:
+            log_message(f"Updating encoding {args.old_encoding} with edge diff {args.edge_diff}.")
+            instance.encode_incremental(args.old_encoding, args.edge_diff, f"{args.out_dir}/{args.out_file}")
         log_message(f"Encoding completed! Written to {args.out_dir}/{args.out_file}.")
+        if args.edge_diff is not None and args.check:
+            if instance.matches_full_encoding(f"{args.out_dir}/{args.out_file}"):
+                log_message("Check passed: encoding matches a full re-encode.")
+            else:
+                log_message("Check FAILED: encoding does not match a full re-encode.")
+                exit_code = 1
     except Exception as exc:
         log_message("Encoding FAILED.")
         log_message(exc)
+        exit_code = 1
 else:
     log_message("Building failed. Aborting rest of the process.")
+    exit_code = 1
 
 sys.stdout.flush()
 
 log_message("Done!")
+sys.exit(exit_code)
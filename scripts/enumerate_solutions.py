@@ -50,12 +50,23 @@ THE SOFTWARE.
 import argparse
 import os
 import re
-from typing import Tuple, Any
+
+# Own modules/libraries
+from roundingsat_runner import run_roundingsat
 
 parser = argparse.ArgumentParser()
 required_args = parser.add_argument_group("Required arguments")
+optional_args = parser.add_argument_group("Optional arguments")
 required_args.add_argument("--roundingsat", "-r", type=str, required=True,
                            help="Path to directory with RoundingSAT.")
+optional_args.add_argument("--max_conflicts", type=int, required=False, default=None,
+                           help="Terminate a solver run after this many conflicts.")
+optional_args.add_argument("--max_time", type=float, required=False, default=None,
+                           help="Terminate a solver run after this many seconds.")
+optional_args.add_argument("--max_memory", type=float, required=False, default=None,
+                           help="Terminate a solver run when it uses more than this many MB.")
+optional_args.add_argument("--show_progress", action="store_true",
+                           help="Print the solver's progress (number of conflicts) while it runs.")
 args = parser.parse_args()
 
 # Set parameters
@@ -85,22 +96,44 @@ csts_pat = re.compile(r'\* #variable= \d+ #constraint=(?P<n_csts>\d+)\s*')
 #                                                                              #
 ################################################################################
 
-def parse_roundingsat_output(roundingsat_output_file: str) -> tuple[str, ...] | tuple[Any, ...]:
-    """ Parse the output of RoundingSAT to extract the found solution, then
-    return a tuple with strings, such that each element of the tuple represents
-    a literal that is True in the solution. Return an empty tuple if no
-    solution was found by RoundingSAT.
-    :param roundingsat_output_file: path to file that captured RoundingSAT's
-        output.
+def print_progress(event: str, value):
+    """ Callback for run_roundingsat that prints the solver's progress and
+    early termination while it runs.
+    """
+    if event == 'progress' and args.show_progress:
+        print(f"  ... {value} conflicts")
+    elif event == 'terminated':
+        print(f"  ... terminated solver: {value} limit exceeded")
+
+
+def solve(formula: str, proof_log: str, solving_log: str) -> tuple:
+    """ Run RoundingSAT on a PB formula, while writing its output to a log
+    file, and return the found solution as a tuple of strings, such that
+    each element of the tuple represents a literal that is True in the
+    solution. Return an empty tuple if RoundingSAT proved that the formula is
+    unsatisfiable. Raise an exception if the solver was terminated (or
+    stopped) before it reached a conclusion.
+    :param formula: path to PB formula.
+    :param proof_log: path (without extension) for RoundingSAT's proof log.
+    :param solving_log: path to file that captures RoundingSAT's output.
     :return: tuple of strings, where each string represents a literal that is
-        True in the found solution. Return empty tuple if no solution is found.
+        True in the found solution. Empty tuple if no solution exists.
     """
-    with open(roundingsat_output_file, 'r') as rs_file:
-        for line in rs_file.readlines():
-            if line.startswith('v '):
-                elts = line.split()[1:]
-                return tuple(sorted(elts))
-    return tuple([])
+    cmd = [f"{ROUNDINGSAT_DIR}/build/roundingsat",
+           "--print-sol=1",
+           f"--proof-log={proof_log}",
+           formula]
+    result = run_roundingsat(cmd, solving_log,
+                             callback=print_progress,
+                             max_conflicts=args.max_conflicts,
+                             max_time=args.max_time,
+                             max_memory=args.max_memory)
+    if result['terminated'] is not None or \
+            result['status'] not in ('SATISFIABLE', 'UNSATISFIABLE'):
+        raise Exception(
+            f"ERROR: RoundingSAT did not finish on {formula} "
+            f"(status: {result['status']}, terminated: {result['terminated']}). See {solving_log}.")
+    return result['solution']
 
 
 def construct_blocking_constraint(solution: tuple) -> str:
@@ -226,13 +259,9 @@ all_solutions = []
 
 while satisfiable:
     current_formula = new_formula
-    cmd = f"{ROUNDINGSAT_DIR}/build/roundingsat " +\
-          f"--print-sol=1 " + \
-          f"--proof-log={OUT_DIR}/{out_file} " +\
-          f"{current_formula} > " +\
-          f"{LOG_DIR}/{network}.b_{budget}.it_{it:02}.solving.log"
-    os.system(cmd)
-    new_sol = parse_roundingsat_output(f"{LOG_DIR}/{network}.b_{budget}.it_{it:02}.solving.log")
+    new_sol = solve(current_formula,
+                    f"{OUT_DIR}/{out_file}",
+                    f"{LOG_DIR}/{network}.b_{budget}.it_{it:02}.solving.log")
     if not new_sol:
         satisfiable = False
         unsat_formula = current_formula
@@ -274,13 +303,9 @@ for i, solution in enumerate(all_solutions):
     add_unit_clauses(original_formula,
                      new_formula,
                      solution)
-    cmd = f"{ROUNDINGSAT_DIR}/build/roundingsat " +\
-          f"--print-sol=1 " + \
-          f"--proof-log={OUT_DIR}/{out_file}.it_00.sol_{i+1:02}.opb " +\
-          f"{new_formula} > " +\
-          f"{LOG_DIR}/{network}.b_{budget}.it_{it:02}.sol_{i+1:02}.solving.log"
-    os.system(cmd)
-    new_sol = parse_roundingsat_output(f"{LOG_DIR}/{network}.b_{budget}.it_{it:02}.sol_{i+1:02}.solving.log")
+    new_sol = solve(new_formula,
+                    f"{OUT_DIR}/{out_file}.it_00.sol_{i+1:02}.opb",
+                    f"{LOG_DIR}/{network}.b_{budget}.it_{it:02}.sol_{i+1:02}.solving.log")
     if not new_sol:
         satisfiable = False
         raise Exception(f"Solution {i+1} is not a solution of {original_formula}! Solution: {', '.join(solution)}, {new_sol}")
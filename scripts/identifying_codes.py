@@ -90,8 +90,10 @@ class IdentifyingCodesInstance:
     def __init__(self):
 
         self._network_file = None
+        self._edge_diff_file = None
         self._budget = None
         self._fault_tolerance = None
+        self._radius = None
 
         self._G = None
         self._record_renaming = True
@@ -103,10 +105,12 @@ class IdentifyingCodesInstance:
     def build_from_file(self,
                         network_file: str,
                         budget=-1,
-                        fault_tolerance=0):
+                        fault_tolerance=0,
+                        radius=1):
         """
         :param network_file:  edge list or mtx file describing a network
         :param budget:        maximum number of sensors to place
+        :param radius:        each sensor covers the nodes within this distance
         :return:              None
         """
 
@@ -115,6 +119,7 @@ class IdentifyingCodesInstance:
         self._n_vars = self._G.number_of_nodes()
         self._budget = budget
         self._fault_tolerance = fault_tolerance
+        self._radius = radius
 
     def _create_from_edge_list(self):
         with open(self._network_file, 'r') as infile:
@@ -124,6 +129,38 @@ class IdentifyingCodesInstance:
             self._G = nx.Graph()
             self._G.add_edges_from(edges)
 
+    def apply_edge_diff(self, edge_diff_file: str) -> list:
+        """
+        Edit the network according to an edge-diff file. Each line of that
+        file is either '+ u v' (add edge {u, v}) or '- u v' (remove edge
+        {u, v}). Nodes that have no edges left are removed from the network.
+        :param edge_diff_file: path to edge-diff file
+        :return:               list of tuples (op, u, v) of the edits that
+                               changed the network, in the order in which
+                               they were applied. Adding an edge that already
+                               exists is not an edit.
+        """
+        self._edge_diff_file = edge_diff_file
+        edits = []
+        with open(edge_diff_file, 'r') as infile:
+            for line in infile:
+                if line.startswith('#') or line.startswith('%') or not line.strip():
+                    continue
+                op, u, v = line.split()[:3]
+                if op == '+':
+                    if self._G.has_edge(u, v):
+                        continue
+                    self._G.add_edge(u, v)
+                elif op == '-':
+                    self._G.remove_edge(u, v)
+                else:
+                    raise ValueError(f"Unknown operation '{op}' in edge-diff file {edge_diff_file}.")
+                edits.append((op, u, v))
+        endpoints = set([node for _, u, v in edits for node in (u, v)])
+        self._G.remove_nodes_from([node for node in endpoints if node in self._G and self._G.degree(node) == 0])
+        self._n_vars = self._G.number_of_nodes()
+        return edits
+
     def _get_header(self):
         """
         :return:         List of strings, each string a line in the header
@@ -142,6 +179,7 @@ class IdentifyingCodesInstance:
             f'Number of nodes:   {self._G.number_of_nodes()}',
             f'Number of edges:   {self._G.number_of_edges()}',
             f'Budget:            {self._budget}',
+            f'Radius:            {self._radius}',
             '', '',
             'REPRODUCIBILITY INFO',
             '--------------------',
@@ -154,6 +192,8 @@ class IdentifyingCodesInstance:
             f'Machine:           {socket.gethostname()}',
             ''
         ]
+        if self._edge_diff_file is not None:
+            header.insert(4, f'Edge diff file:    {self._edge_diff_file}')
         return header
 
 
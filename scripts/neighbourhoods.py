@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Author:              Anna L.D. Latour
+Creation date:       19 October 2026
+Maintainer:          Anna L.D. Latour
+Contact:             a.l.d.latour@tudelft.nl
+File:                neighbourhoods.py
+Description:         Functions for computing closed radius-r neighbourhoods
+                     (balls) of all nodes in a network.
+                     A ball is stored as a sorted array of node indices
+                     (unsigned ints), which takes four bytes per node, however
+                     the nodes are numbered. Set operations on balls are done
+                     by Python's built-in sets, which run in C.
+                     Sets of node indices that must be stored in large numbers
+                     (e.g., the left-hand sides of constraints) are packed as
+                     the bytes of such an array, which makes them hashable.
+Version:             0.0.1
+Copyright:           (C) 2026, Anna L.D. Latour
+License:             MIT
+
+Copyright (C) 2026 Anna L.D. Latour
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+# Generic/Built-in
+from array import array
+
+
+def compute_balls(adjacency: list, radius: int) -> list:
+    """ Compute the closed radius-r neighbourhood of every node, by a
+    truncated multi-source breadth-first search: in round k, the ball of each
+    node is extended with the balls of its neighbours, which yields all nodes
+    at distance <= k.
+    :param adjacency: list such that adjacency[i] is a list of the indices of
+        the neighbours of node i.
+    :param radius: the radius r >= 0 of the balls.
+    :return: list such that element i is the ball of radius r around node i,
+        as a sorted array of node indices.
+    """
+    if radius < 0:
+        raise ValueError(f"Radius must be non-negative, got {radius}.")
+    balls = [array('I', [idx]) for idx in range(len(adjacency))]
+    for _ in range(radius):
+        balls = [
+            array('I', sorted(set(balls[idx]).union(*[balls[nb] for nb in neighbours])))
+            for idx, neighbours in enumerate(adjacency)
+        ]
+    return balls
+
+
+def union_of_balls(balls: list, indices) -> set:
+    """ Return the union of the balls of all nodes in indices, as a set of
+    node indices. Applied to the radius-r ball of a node, this yields its
+    radius-2r ball.
+    """
+    return set().union(*[balls[idx] for idx in indices])
+
+
+def pack_indices(indices) -> bytes:
+    """ Return a compact, hashable representation of a set of node indices:
+    the sorted indices, packed as unsigned ints. Two packed sets are equal iff
+    they contain the same indices.
+    """
+    return array('I', sorted(indices)).tobytes()
+
+
+def unpack_indices(packed: bytes) -> array:
+    """ Return the sorted node indices in a set packed by pack_indices. """
+    indices = array('I')
+    indices.frombytes(packed)
+    return indices
+
+
+def truncated_bfs(adjacency, sources, radius: int) -> set:
+    """ Return the set of nodes within distance radius of any of the sources,
+    by a breadth-first search that stops at depth radius. Sources that are not
+    in the network are ignored.
+    :param adjacency: mapping from each node to its neighbours (e.g., G.adj).
+    :param sources: iterable of nodes.
+    :param radius: maximum distance.
+    """
+    seen = set([node for node in sources if node in adjacency])
+    frontier = list(seen)
+    for _ in range(radius):
+        next_frontier = []
+        for node in frontier:
+            for nb in adjacency[node]:
+                if nb not in seen:
+                    seen.add(nb)
+                    next_frontier.append(nb)
+        frontier = next_frontier
+    return seen
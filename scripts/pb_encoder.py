@@ -38,10 +38,206 @@ THE SOFTWARE.
 """
 
 
-import networkx as nx
+from collections import Counter
+from collections.abc import Mapping
+import copy
+import itertools
+import os
+import re
+import tempfile
 
 # Own modules/libraries
 from identifying_codes import IdentifyingCodesInstance
+from neighbourhoods import compute_balls, pack_indices, truncated_bfs, union_of_balls, unpack_indices
+
+
+# Number of characters of an old encoding that are read at once when it is
+# streamed to an updated encoding.
+STREAM_CHUNK_SIZE = 1 << 22
+
+
+def _read_opb_header(infile) -> tuple:
+    """
+    Read the header of a PB formula written by PBEncoder, up to and including
+    the first constraint line.
+    :param infile: file object, opened for reading at the start of the file
+    :return:       tuple (info, first_constraint), where info is a dict with
+                   the numbers of variables ('n_vars') and constraints
+                   ('n_csts'), the budget, the radius and the fault tolerance
+                   with which the formula was encoded, and the renaming info
+                   ('node2var') from the header, and first_constraint is the
+                   first constraint line (None if the file has no constraints)
+    """
+    # Encodings without a 'Radius:' line predate the --radius option
+    info = {'n_vars': None, 'n_csts': None, 'budget': None, 'radius': 1, 'fault_tolerance': None,
+            'node2var': dict()}
+    for line in infile:
+        if not line.startswith('*'):
+            line = line.rstrip('\n')
+            if not line:
+                continue
+            if not line.startswith('-1 '):
+                # All constraints but the cardinality constraint have
+                # right-hand side k + 1
+                info['fault_tolerance'] = int(line.split('>=')[1].split()[0]) - 1
+            return info, line
+        fields = line[1:].split()
+        if fields[:1] == ['#variable=']:
+            info['n_vars'] = int(fields[1])
+            info['n_csts'] = int(fields[3])
+        elif fields[:1] == ['Budget:']:
+            info['budget'] = int(fields[1])
+        elif fields[:1] == ['Radius:']:
+            info['radius'] = int(fields[1])
+        elif fields == ['node', 'idx']:
+            # The renaming info is a line of dashes, one line '* node idx' per
+            # node, and an empty line.
+            next(infile)
+            node2var = info['node2var']
+            for line in infile:
+                fields = line.split()
+                if len(fields) != 3:
+                    break
+                node2var[fields[1]] = int(fields[2])
+    return info, None
+
+
+def _read_opb(pb_file: str) -> tuple:
+    """
+    Read a PB formula written by PBEncoder.
+    :param pb_file: path to OPB file
+    :return:        tuple (info, constraints), where info is the header info
+                    (see _read_opb_header), and constraints is the list of
+                    constraint lines
+    """
+    with open(pb_file, 'r') as infile:
+        info, first_constraint = _read_opb_header(infile)
+        if first_constraint is None:
+            return info, []
+        constraints = [first_constraint] + [line.rstrip('\n') for line in infile if line.strip()]
+    return info, constraints
+
+
+def _trie_pattern(words: list) -> str:
+    """
+    Return a regular expression that matches exactly the given words, as a
+    trie of nested groups, e.g., ['12 ', '15 ', '3 '] becomes '(?:1(?:2 |5 )|3 )'.
+    Python's regex engine tries the branches of a group one by one, so this
+    is much faster to match than a flat alternation of many words. No word
+    may be a prefix of another one.
+    """
+    if words == ['']:
+        return ''
+    groups = dict()
+    for word in words:
+        groups.setdefault(word[0], []).append(word[1:])
+    branches = [re.escape(char) + _trie_pattern(rest) for char, rest in sorted(groups.items())]
+    return branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+
+
+def _filter_constraint_lines(infile, first_constraint: str, candidates, rewrite):
+    """
+    Stream the constraint lines of a PB formula, leaving out or rewriting
+    some of them. The lines are read in large chunks, and only the lines that
+    match the regular expression candidates are looked at in Python; all
+    other lines are copied as they are.
+    :param infile:           file object, positioned after first_constraint
+    :param first_constraint: first constraint line (see _read_opb_header)
+    :param candidates:       compiled regular expression that matches a
+                             newline followed by a whole line. Starting with a
+                             literal newline lets the regex engine skip to the
+                             starts of lines quickly.
+    :param rewrite:          function that takes a candidate line, and returns
+                             the line that replaces it, or None if it must be
+                             left out
+    :return:                 generator of strings, each of which is one or
+                             more constraint lines, joined by newlines
+    """
+    pending = first_constraint + '\n'
+    while True:
+        chunk = '\n' + pending + infile.read(STREAM_CHUNK_SIZE)
+        if chunk == '\n':
+            return
+        # Make sure the chunk ends at the end of a line
+        chunk += infile.readline()
+        pending = ''
+        pieces = []
+        start = 0
+        for m in candidates.finditer(chunk):
+            line = m.group()[1:]
+            new_line = rewrite(line)
+            if new_line != line:
+                pieces.append(chunk[start:m.start()])
+                if new_line is not None:
+                    pieces.append('\n' + new_line)
+                start = m.end()
+        pieces.append(chunk[start:])
+        block = ''.join(pieces).strip('\n')
+        if block:
+            yield block
+
+
+class _AdjacencyBeforeEdits(Mapping):
+    """
+    Read-only view of the adjacency of a network as it was before a list of
+    edits (see IdentifyingCodesInstance.apply_edge_diff) was applied to it.
+    Only the neighbourhoods of the endpoints of the edits are stored; all
+    other neighbourhoods are looked up in the current network.
+    """
+
+    def __init__(self, G, edits: list):
+        self._G = G
+        self._changed = dict()
+        for op, u, v in reversed(edits):
+            for node, nb in [(u, v), (v, u)]:
+                if node not in self._changed:
+                    self._changed[node] = set(G.adj[node]) if node in G else set()
+                if op == '+':
+                    self._changed[node].discard(nb)
+                else:
+                    self._changed[node].add(nb)
+
+    def __getitem__(self, node):
+        if node in self._changed:
+            if not self._changed[node]:
+                # The node was added by the edits
+                raise KeyError(node)
+            return self._changed[node]
+        return self._G.adj[node]
+
+    def __iter__(self):
+        for node in self._G:
+            if node not in self._changed:
+                yield node
+        for node, neighbours in self._changed.items():
+            if neighbours:
+                yield node
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+def _ball_function(adjacency, radius: int):
+    """
+    Return a function that maps a node to its closed radius-r neighbourhood
+    (as a frozenset) in the network with the given adjacency, computing each
+    neighbourhood only once.
+    """
+    balls = dict()
+
+    def ball(node):
+        if node not in balls:
+            balls[node] = frozenset(truncated_bfs(adjacency, [node], radius))
+        return balls[node]
+    return ball
+
+
+def _constraint_vars(constraint: str) -> frozenset:
+    """
+    Return the variables (e.g., 'x12') in a constraint line of the form
+    '+1 x12 +1 x5 >= 1 ;'.
+    """
+    return frozenset(constraint.split()[1:-3:2])
 
 
 class PBEncoder(IdentifyingCodesInstance):
@@ -50,6 +246,10 @@ class PBEncoder(IdentifyingCodesInstance):
         IdentifyingCodesInstance.__init__(self)
         self._node2var = dict()
         self._var2node = dict()
+        # For computing neighbourhoods, each node gets an index, and each ball
+        # is a sorted array of node indices.
+        self._idx2node = []
+        self._balls = []
 
     def _rename_variables(self):
         self._node2var = {node: idx + 1 for idx, node in enumerate(self._G.nodes())}
@@ -70,21 +270,27 @@ class PBEncoder(IdentifyingCodesInstance):
         info.append('')
         return info
 
+    def _compute_balls(self):
+        """
+        Compute the closed r-neighbourhood (ball) of each node as a sorted
+        array of the node indices in self._idx2node.
+        """
+        self._idx2node = list(self._G.nodes())
+        node2idx = {node: idx for idx, node in enumerate(self._idx2node)}
+        adjacency = [[node2idx[nb] for nb in self._G.neighbors(node)] for node in self._idx2node]
+        self._balls = compute_balls(adjacency, self._radius)
+
     def _alo_constraints(self) -> set:
         """
-        For each node in the network, at least one node in the closed 1-neigh-
+        For each node in the network, at least one node in the closed r-neigh-
         bourhood of that node must have a sensor. Hence, the sum of the x
         variables corresponding to the nodes in that neighbourhood, must be at
         least k + 1 (fault tolerance).
-        :return: set of sets
+        :return: set of left-hand sides, as packed sets of node indices
         """
-        alo_csts = set()
-        for node in self._G.nodes():
-            lhs = frozenset(nx.ego_graph(self._G, node, radius=1, center=True, undirected=True).nodes())
-            alo_csts.add((lhs, self._fault_tolerance + 1))
-        return alo_csts
+        return set([ball.tobytes() for ball in self._balls])
 
-    def _unique_constraints(self):
+    def _unique_constraints(self) -> set:
         """
         We must encode that all signatures are unique. This means that for
         every two nodes v and u, at least one x variable corresponding to a node
@@ -93,48 +299,35 @@ class PBEncoder(IdentifyingCodesInstance):
         and u must be larger or equal than 1.
 
         Note that we only have to check the v's and u's that are in each other's
-        closed 2-neighbourhoods.
-        :return:
+        closed 2r-neighbourhoods, since otherwise their r-neighbourhoods are
+        disjoint, and the constraint is implied by the ALO constraints.
+        :return: set of left-hand sides, as packed sets of node indices
         """
-
-        # Do some preprocessing for faster performance
-        closed_1_neighbourhoods = {
-            node: set(nx.ego_graph(self._G, node, radius=1, center=True, undirected=True).nodes())
-            for node in self._G
-        }
-        closed_2_neighbourhoods = {
-            node: set(nx.ego_graph(self._G, node, radius=2, center=True, undirected=True).nodes())
-            for node in self._G
-        }
-
-        pair2constraint = dict()
-        for v in self._G.nodes():
-            N2_v = set(closed_2_neighbourhoods[v])
-            N1_v = set(closed_1_neighbourhoods[v])
-            for u in N2_v:
-                pair = tuple(sorted([v, u]))
-                if u is not v and pair not in pair2constraint.keys():
-                    N1_u = set(closed_1_neighbourhoods[u])
-                    distinguishing_set = frozenset(N1_v.symmetric_difference(N1_u))
-                    pair2constraint[pair] = distinguishing_set
-        left_hand_sides = set(pair2constraint.values())
-        return set([(lhs, self._fault_tolerance + 1) for lhs in left_hand_sides])
+        left_hand_sides = set()
+        for v, B_v in enumerate(self._balls):
+            N_v = set(B_v)
+            for u in union_of_balls(self._balls, B_v):
+                if u > v:
+                    left_hand_sides.add(pack_indices(N_v.symmetric_difference(self._balls[u])))
+        return left_hand_sides
 
     def _write_pb_to_opb(self, pb_file, n_vars, n_csts, constraints, header):
         """
         :param n_vars:
         :param n_csts:
-        :param constraints:
+        :param constraints: iterable of strings, each of which is one or more
+                            constraint lines, joined by newlines
         :param pb_file:
         :return:
         """
 
         info = f'* #variable= {n_vars} #constraint= {n_csts}'
         opb = [info] + \
-            ['* ' + line for line in header] + \
-            constraints
+            ['* ' + line for line in header]
         with open(pb_file, 'w') as ofile:
             ofile.write('\n'.join(opb))
+            for cst in constraints:
+                ofile.write('\n' + cst)
 
     def encode(self, pb_file):
         # RoundingSAT does not accept arbitrary variable names, so we must do some renaming:
@@ -147,28 +340,231 @@ class PBEncoder(IdentifyingCodesInstance):
             f'self._G.number_of_nodes() = {self._G.number_of_nodes()}'
 
         # Get the left-hand-sides of the various constraints
+        self._compute_balls()
         alo_csts = self._alo_constraints()
         unique_csts = self._unique_constraints()
         csts = alo_csts.union(unique_csts)
-        renamed_csts = [([self._node2var[n] for n in lhs], degree) for lhs, degree in csts]
+        idx2term = [f'+1 x{self._node2var[node]}' for node in self._idx2node]
 
-        # Create the PB constraints in the correct format
-        pb_csts = [
-            ' '.join([f'+1 x{var}' for var in vars]) +
-            f' >= {degree} ;' for (vars, degree) in renamed_csts
-        ]
+        # Create the PB constraints in the correct format. We generate them
+        # lazily, such that large encodings do not have to be kept in memory.
+        pb_csts = (
+            ' '.join([idx2term[idx] for idx in unpack_indices(lhs)]) +
+            f' >= {self._fault_tolerance + 1} ;' for lhs in csts
+        )
         # For the cardinality constraint, we must multiply the LHS and the RHS with -1,
         # so we can turn the '<=' into a '>=', since RoundingSAT only supports
         # '>=' and '=' comparators.
         cardinality_lhs = (self._node2var[n] for n in self._G.nodes())
-        pb_csts += [
+        pb_csts = itertools.chain(pb_csts, [
             ' '.join([f'-1 x{var}' for var in cardinality_lhs]) +
             f' >= {-self._budget} ;'
-        ]
+        ])
 
         n_vars = self._G.number_of_nodes()
-        n_csts = len(pb_csts)
+        n_csts = len(csts) + 1
         header = self._get_header()
         header.extend(self._get_renaming_info())
 
-        self._write_pb_to_opb(pb_file, n_vars, n_csts, pb_csts, header)
\ No newline at end of file
+        self._write_pb_to_opb(pb_file, n_vars, n_csts, pb_csts, header)
+
+    def _affected_left_hand_sides(self, adjacency, ball, affected: set) -> set:
+        """
+        Return the left-hand sides of the ALO constraints of the affected
+        nodes, and of the distinguishing-set constraints of all pairs that
+        contain an affected node, in the network with the given adjacency and
+        ball function (for radius r).
+        :return: set of frozensets of nodes
+        """
+        left_hand_sides = set()
+        for v in affected:
+            if v not in adjacency:
+                continue
+            left_hand_sides.add(ball(v))
+            for u in truncated_bfs(adjacency, [v], 2 * self._radius):
+                if u != v:
+                    left_hand_sides.add(ball(v) ^ ball(u))
+        return left_hand_sides
+
+    def _has_unaffected_source(self, lhs: frozenset, ball, affected: set) -> bool:
+        """
+        Check whether a left-hand side is generated by the ALO constraint of
+        an unaffected node w, or by the distinguishing-set constraint of a
+        pair of unaffected nodes (w, x). Unaffected nodes have the same balls
+        before and after the edits, so the answer is the same in both
+        networks. Any node d in the left-hand side is in the ball of w, say,
+        so we only need to try the nodes w within distance r of d. Then the
+        ball of x must be ball(w) ^ lhs, so x is within distance r of every
+        node in that set.
+        """
+        G = self._G
+        if not lhs:
+            # Unaffected twins: these can be anywhere in the network
+            balls = [ball(node) for node in G if node not in affected]
+            return len(set(balls)) < len(balls)
+        if not all(node in G for node in lhs):
+            return False
+        d = next(iter(lhs))
+        for w in ball(d) - affected:
+            if ball(w) == lhs:
+                return True
+            target = ball(w) ^ lhs
+            if target.isdisjoint(ball(w)):
+                # Disjoint balls are more than 2r apart, so they form no pair
+                continue
+            for x in (target & ball(next(iter(target)))) - affected:
+                if ball(x) == target:
+                    return True
+        return False
+
+    def encode_incremental(self, old_pb_file, edge_diff_file, pb_file):
+        """
+        Apply an edge diff to the network, and update the encoding in
+        old_pb_file (which must encode the network before the edit, with the
+        same budget, radius and fault tolerance) without re-encoding from
+        scratch. An edge {a, b} can only change the r-balls of nodes within
+        distance r - 1 of a or b, and hence only the ALO and distinguishing-set
+        constraints that involve those nodes. Only those constraints are
+        recomputed; all other constraint lines are streamed from old_pb_file
+        to pb_file.
+        :param old_pb_file:    path to encoding of the network before the edit
+        :param edge_diff_file: path to edge-diff file (see apply_edge_diff)
+        :param pb_file:        path to which the new encoding is written
+        """
+        if os.path.abspath(old_pb_file) == os.path.abspath(pb_file):
+            raise ValueError(f"Cannot update encoding {old_pb_file} in place.")
+        with open(old_pb_file, 'r') as infile:
+            info, first_constraint = _read_opb_header(infile)
+            if info['fault_tolerance'] is None:
+                # No constraint tells us the fault tolerance
+                info['fault_tolerance'] = self._fault_tolerance
+            if (info['budget'], info['radius'], info['fault_tolerance']) != \
+                    (self._budget, self._radius, self._fault_tolerance):
+                raise ValueError(
+                    f"Encoding {old_pb_file} has budget {info['budget']}, radius {info['radius']} and fault "
+                    f"tolerance {info['fault_tolerance']}, but the update uses budget {self._budget}, radius "
+                    f"{self._radius} and fault tolerance {self._fault_tolerance}.")
+
+            edits = self.apply_edge_diff(edge_diff_file)
+            endpoints = list(dict.fromkeys([node for _, u, v in edits for node in (u, v)]))
+            old_adj = _AdjacencyBeforeEdits(self._G, edits)
+
+            # Find the nodes whose r-balls changed
+            near = truncated_bfs(old_adj, endpoints, self._radius - 1) | \
+                truncated_bfs(self._G.adj, endpoints, self._radius - 1)
+            old_ball = _ball_function(old_adj, self._radius)
+            new_ball = _ball_function(self._G.adj, self._radius)
+            affected = set([node for node in near if old_ball(node) != new_ball(node)])
+
+            # A left-hand side of an affected node that does not also come
+            # from unaffected nodes is only in the old encoding (removed) or
+            # only in the new one (added). Since each left-hand side occurs in
+            # an encoding exactly once, this also gives the new number of
+            # constraints.
+            old_lhss = self._affected_left_hand_sides(old_adj, old_ball, affected)
+            new_lhss = self._affected_left_hand_sides(self._G.adj, new_ball, affected)
+            removed_lhss = [lhs for lhs in old_lhss - new_lhss
+                            if not self._has_unaffected_source(lhs, new_ball, affected)]
+            added_lhss = [lhs for lhs in new_lhss - old_lhss
+                          if not self._has_unaffected_source(lhs, new_ball, affected)]
+
+            # Forget the removed nodes, and give their variables to the new
+            # ones. Only endpoints of the edits can be new or removed. All
+            # constraints of a removed node are removed constraints, so its
+            # variable is free in the new encoding.
+            node2var = info['node2var']
+            removed_keys = set([frozenset([f'x{node2var[n]}' for n in lhs]) for lhs in removed_lhss])
+            free_vars = sorted([node2var.pop(node) for node in endpoints
+                                if node not in self._G and node in node2var], reverse=True)
+            next_var = info['n_vars'] + 1
+            for node in endpoints:
+                if node in self._G and node not in node2var:
+                    if free_vars:
+                        node2var[node] = free_vars.pop()
+                    else:
+                        node2var[node] = next_var
+                        next_var += 1
+
+            # The variables must stay 1, ..., n: a variable that occurs in no
+            # constraint would double the number of models. The nodes with
+            # the highest variables move to the variables that are still free.
+            n_vars = len(node2var)
+            free_vars = [var for var in free_vars if var <= n_vars]
+            renamed = dict()
+            for node, var in node2var.items():
+                if var > n_vars:
+                    renamed[f'x{var}'] = f'x{free_vars[-1]}'
+                    node2var[node] = free_vars.pop()
+            self._node2var = node2var
+            self._var2node = {var: node for node, var in self._node2var.items()}
+
+            # A removed line starts with one of the variables of the removed
+            # left-hand sides, or with ' >=' if its left-hand side is empty.
+            # The cardinality constraint (which starts with '-1 ') is rebuilt.
+            # Lines with a moved variable anywhere are rewritten.
+            removed_vars = set([var for key in removed_keys for var in key])
+            candidates = re.compile(r'\n(?:-1 | >=' + (
+                r'|\+1 x' + _trie_pattern([var[1:] + ' ' for var in removed_vars]) if removed_vars else ''
+            ) + (
+                r'|[^\n]* x' + _trie_pattern([var[1:] + ' ' for var in renamed]) if renamed else ''
+            ) + ')[^\n]*')
+            n_removed = [0]
+
+            def rewrite(cst):
+                if cst.startswith('-1 '):
+                    return None
+                if _constraint_vars(cst) in removed_keys:
+                    n_removed[0] += 1
+                    return None
+                return ' '.join([renamed.get(token, token) for token in cst.split(' ')])
+
+            pb_csts = itertools.chain(
+                [] if first_constraint is None else
+                _filter_constraint_lines(infile, first_constraint, candidates, rewrite), (
+                    ' '.join([f'+1 x{var}' for var in sorted([self._node2var[n] for n in lhs])]) +
+                    f' >= {self._fault_tolerance + 1} ;' for lhs in added_lhss
+                ))
+            cardinality_lhs = self._node2var.values()
+            pb_csts = itertools.chain(pb_csts, [
+                ' '.join([f'-1 x{var}' for var in cardinality_lhs]) +
+                f' >= {-self._budget} ;'
+            ])
+
+            n_csts = info['n_csts'] - len(removed_lhss) + len(added_lhss)
+            header = self._get_header()
+            header.extend(self._get_renaming_info())
+
+            self._write_pb_to_opb(pb_file, n_vars, n_csts, pb_csts, header)
+
+        if n_removed[0] != len(removed_lhss):
+            raise ValueError(f"Encoding {old_pb_file} does not encode the network before the edits in "
+                             f"{edge_diff_file}: found {n_removed[0]} of {len(removed_lhss)} removed constraints.")
+
+    def matches_full_encoding(self, pb_file) -> bool:
+        """
+        Check that the encoding in pb_file matches a full encoding of the
+        current network: the same numbers of variables and constraints in the
+        header, the same nodes in the renaming info, each with its own
+        variable in 1, ..., n, and the same constraints. Since the variable
+        numbering may differ, the constraints are compared in terms of the
+        node names.
+        :param pb_file: path to OPB file
+        :return:        True if the encodings match, False otherwise
+        """
+        def summary(opb_file):
+            info, constraints = _read_opb(opb_file)
+            node2var = info['node2var']
+            var2node = {f'x{var}': node for node, var in node2var.items()}
+            return (
+                info['n_vars'], info['n_csts'], set(node2var),
+                sorted(node2var.values()) == list(range(1, info['n_vars'] + 1)),
+                Counter([
+                    (frozenset([var2node.get(var) for var in _constraint_vars(cst)]), cst.split('>=')[1].strip())
+                    for cst in constraints
+                ])
+            )
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            reference_file = f'{tmp_dir}/reference.opb'
+            copy.copy(self).encode(reference_file)
+            return summary(pb_file) == summary(reference_file)
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""
+Author:              Anna L.D. Latour
+Creation date:       19 October 2026
+Maintainer:          Anna L.D. Latour
+Contact:             a.l.d.latour@tudelft.nl
+File:                roundingsat_runner.py
+Description:         Wrapper for running RoundingSAT as a subprocess. The
+                     solver's stdout is read through a pipe as it arrives,
+                     copied to a log file, and parsed on the fly, such that
+                     progress (number of conflicts), the found solution and
+                     the final status become available while the solver
+                     runs. The run can be terminated early when it exceeds a
+                     limit on the number of conflicts, the wall-clock time or
+                     the memory usage.
+Version:             0.0.1
+Copyright:           (C) 2026, Anna L.D. Latour
+License:             MIT
+
+Copyright (C) 2026 Anna L.D. Latour
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in
+all copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+THE SOFTWARE.
+"""
+
+# Generic/Built-in
+import queue
+import re
+import subprocess
+import threading
+import time
+from typing import Callable, Optional
+
+
+# Progress lines look like 'c #Conflicts: 2000 | #Constraints: 1234 | ...'.
+progress_pat = re.compile(r'c #Conflicts:\s*(?P<n_conflicts>\d+)')
+# The statistics at the end of a run contain a line 'c conflicts 43'.
+final_conflicts_pat = re.compile(r'c conflicts\s+(?P<n_conflicts>\d+)\s*$')
+
+# How often (in seconds) the time and memory limits are checked when the
+# solver does not produce any output.
+POLL_INTERVAL = 0.1
+
+
+def parse_roundingsat_line(line: str) -> Optional[tuple]:
+    """ Parse a single line of RoundingSAT output, and return a tuple
+    (event, value) if the line carries information that we are interested in,
+    or None otherwise. The events are:
+        'progress':   value is the number of conflicts so far (int);
+        'statistics': value is the total number of conflicts, as reported in
+                      the statistics at the end of the run (int);
+        'solution':   value is a sorted tuple of strings, where each string
+                      represents a literal that is True in the found solution;
+        'status':     value is the final status reported by the solver, e.g.
+                      'SATISFIABLE' or 'UNSATISFIABLE' (str).
+    :param line: a line of RoundingSAT's output.
+    :return: tuple (event, value), or None.
+    """
+    if line.startswith('v '):
+        return 'solution', tuple(sorted(line.split()[1:]))
+    if line.startswith('s '):
+        return 'status', line[2:].strip()
+    m = re.match(progress_pat, line)
+    if m is not None:
+        return 'progress', int(m.group('n_conflicts'))
+    m = re.match(final_conflicts_pat, line)
+    if m is not None:
+        return 'statistics', int(m.group('n_conflicts'))
+    return None
+
+
+def _get_memory_usage(pid: int) -> Optional[float]:
+    """ Return the resident set size of the process with the given pid in MB,
+    or None if it cannot be determined (e.g., on systems without /proc).
+    """
+    try:
+        with open(f'/proc/{pid}/status', 'r') as status_file:
+            for line in status_file:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def _enqueue_lines(stream, line_queue: queue.Queue):
+    for line in iter(stream.readline, ''):
+        line_queue.put(line)
+    stream.close()
+    line_queue.put(None)
+
+
+def _terminate(proc: subprocess.Popen):
+    if proc.poll() is None:
+        proc.terminate()
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def run_roundingsat(cmd: list,
+                    log_file: str,
+                    callback: Optional[Callable[[str, object], None]] = None,
+                    max_conflicts: Optional[int] = None,
+                    max_time: Optional[float] = None,
+                    max_memory: Optional[float] = None) -> dict:
+    """ Run RoundingSAT with the given command, while streaming its output to
+    log_file and parsing it as it arrives. For every line that parses into an
+    event (see parse_roundingsat_line), callback(event, value) is called.
+    If one of the limits is exceeded before the solver reports a status, the
+    solver is terminated, and callback('terminated', reason) is called.
+
+    :param cmd: command to run, as a list of strings (e.g.
+        ['/path/to/roundingsat', '--print-sol=1', 'formula.opb']).
+    :param log_file: path to file to which the solver's output is copied.
+    :param callback: function that takes an event name and a value.
+    :param max_conflicts: maximum number of conflicts, or None for no limit.
+    :param max_time: maximum wall-clock time in seconds, or None for no limit.
+    :param max_memory: maximum resident memory in MB, or None for no limit.
+    :return: dict with keys
+        'status':     final status reported by the solver, or None if the
+                      solver did not report one;
+        'solution':   tuple of strings, where each string represents a literal
+                      that is True in the found solution. Empty tuple if no
+                      solution is found;
+        'conflicts':  last reported number of conflicts;
+        'time':       wall-clock time of the run in seconds;
+        'terminated': None if the solver finished by itself, otherwise the
+                      limit that caused termination ('conflicts', 'time' or
+                      'memory').
+    """
+    result = {'status': None, 'solution': tuple([]), 'conflicts': 0,
+              'time': 0.0, 'terminated': None}
+
+    def handle(event, value):
+        if callback is not None:
+            callback(event, value)
+
+    start = time.monotonic()
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                            text=True, bufsize=1)
+    line_queue = queue.Queue()
+    reader = threading.Thread(target=_enqueue_lines, args=(proc.stdout, line_queue), daemon=True)
+    reader.start()
+
+    with open(log_file, 'w') as log:
+        while True:
+            try:
+                line = line_queue.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                line = ''
+            if line is None:
+                break
+
+            if line:
+                log.write(line)
+                log.flush()
+                parsed = parse_roundingsat_line(line)
+                if parsed is not None:
+                    event, value = parsed
+                    if event in ('progress', 'statistics'):
+                        result['conflicts'] = value
+                    else:
+                        result[event] = value
+                    handle(event, value)
+
+            if result['terminated'] is not None or result['status'] is not None:
+                # Keep draining the pipe, so that the log is complete. Once
+                # the solver has reported a status, it has concluded, so the
+                # limits no longer apply.
+                continue
+            if max_conflicts is not None and result['conflicts'] > max_conflicts:
+                result['terminated'] = 'conflicts'
+            elif max_time is not None and time.monotonic() - start > max_time:
+                result['terminated'] = 'time'
+            elif max_memory is not None and (_get_memory_usage(proc.pid) or 0) > max_memory:
+                result['terminated'] = 'memory'
+            if result['terminated'] is not None:
+                _terminate(proc)
+                log.write(f"c terminated by wrapper: {result['terminated']} limit exceeded\n")
+                handle('terminated', result['terminated'])
+
+    proc.wait()
+    result['time'] = time.monotonic() - start
+    return result